@@ -47,6 +47,9 @@ setup(
         "web": [
             "gradio>=4.0",
         ],
+        "speedups": [
+            "orjson>=3.9",
+        ],
     },
     classifiers=[
         "Development Status :: 4 - Beta",
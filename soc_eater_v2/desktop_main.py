@@ -7,52 +7,260 @@ from __future__ import annotations
 
 import sys
 import os
+import re
 import json
+import asyncio
 import io
 import threading
 from datetime import datetime
+from functools import lru_cache
 from typing import Any, Optional
 from pathlib import Path
 
 from PyQt6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
-    QLabel, QLineEdit, QPushButton, QTextEdit, QComboBox, QProgressBar,
+    QLabel, QLineEdit, QPushButton, QTextEdit, QPlainTextEdit, QComboBox, QProgressBar, QCheckBox,
     QFileDialog, QMessageBox, QDialog, QDialogButtonBox, QFormLayout,
     QTabWidget, QListWidget, QListWidgetItem, QGroupBox, QSplitter,
     QStatusBar, QMenuBar, QMenu, QToolBar, QFrame, QScrollArea,
     QGridLayout, QSizePolicy, QSpacerItem
 )
-from PyQt6.QtCore import Qt, QSize, pyqtSignal, QObject, QThread, QTimer
+from PyQt6.QtCore import Qt, QSize, pyqtSignal, QObject, QRunnable, QThreadPool, QTimer
 from PyQt6.QtGui import (
     QAction, QIcon, QFont, QColor, QPalette, QTextCursor,
-    QSyntaxHighlighter, QTextCharFormat, QPixmap, QImage,
+    QSyntaxHighlighter, QTextCharFormat, QPixmap, QImage, QImageReader,
     QGuiApplication, QScreen
 )
 from PyQt6.QtSvgWidgets import QSvgWidget
 
 # Import core functionality
 from soc_eater_v2.soc_brain import SOCBrain
-from soc_eater_v2.utils.pcap_parser import summarize_pcap_bytes
+from soc_eater_v2.utils.image_loader import load_image_for_model
+from soc_eater_v2.utils.pcap_parser import summarize_pcap_file
 
 
-class WorkerThread(QThread):
-    """Worker thread for background analysis operations."""
+# Dark theme, parsed once by Qt when applied to the main window; child dialogs inherit it
+APP_STYLESHEET = """
+    QMainWindow {
+        background-color: #1a1a2e;
+    }
+    QWidget {
+        background-color: #1a1a2e;
+        color: #e0e0e0;
+        font-family: 'Segoe UI', 'SF Pro Display', -apple-system, sans-serif;
+        font-size: 14px;
+    }
+    QMenuBar {
+        background-color: #16213e;
+        color: #e0e0e0;
+        padding: 8px;
+    }
+    QMenuBar::item:selected {
+        background-color: #0f3460;
+    }
+    QMenu {
+        background-color: #16213e;
+        color: #e0e0e0;
+        border: 1px solid #0f3460;
+    }
+    QMenu::item:selected {
+        background-color: #0f3460;
+    }
+    QToolBar {
+        background-color: #16213e;
+        border: none;
+        padding: 8px;
+        spacing: 8px;
+    }
+    QToolButton {
+        background-color: transparent;
+        color: #e0e0e0;
+        padding: 8px 12px;
+        border-radius: 4px;
+    }
+    QToolButton:hover {
+        background-color: #0f3460;
+    }
+    QStatusBar {
+        background-color: #16213e;
+        color: #a0a0a0;
+    }
+    QLabel {
+        color: #b0b0b0;
+    }
+    QLineEdit, QTextEdit, QPlainTextEdit, QComboBox {
+        background-color: #16213e;
+        color: #e0e0e0;
+        border: 2px solid #0f3460;
+        border-radius: 6px;
+        padding: 10px;
+        selection-background-color: #0f3460;
+    }
+    QLineEdit:focus, QTextEdit:focus, QPlainTextEdit:focus, QComboBox:focus {
+        border-color: #00d4ff;
+    }
+    QPushButton {
+        background-color: #0f3460;
+        color: #e0e0e0;
+        border: none;
+        border-radius: 6px;
+        padding: 10px 20px;
+        font-weight: 600;
+    }
+    QPushButton:hover {
+        background-color: #1a4a7a;
+    }
+    QPushButton:pressed {
+        background-color: #0a2a50;
+    }
+    QPushButton:disabled {
+        background-color: #2a2a3e;
+        color: #666;
+    }
+    QPushButton.primary {
+        background-color: #00d4ff;
+        color: #1a1a2e;
+    }
+    QPushButton.primary:hover {
+        background-color: #00b8e6;
+    }
+    QGroupBox {
+        background-color: #16213e;
+        border: 2px solid #0f3460;
+        border-radius: 8px;
+        margin-top: 16px;
+        padding-top: 16px;
+        font-weight: 600;
+    }
+    QGroupBox::title {
+        subcontrol-origin: margin;
+        left: 12px;
+        padding: 0 8px;
+        color: #00d4ff;
+    }
+    QListWidget {
+        background-color: #16213e;
+        border: 2px solid #0f3460;
+        border-radius: 6px;
+        color: #e0e0e0;
+    }
+    QListWidget::item:selected {
+        background-color: #0f3460;
+        color: #00d4ff;
+    }
+    QProgressBar {
+        background-color: #16213e;
+        border: 2px solid #0f3460;
+        border-radius: 4px;
+        text-align: center;
+        color: #e0e0e0;
+    }
+    QProgressBar::chunk {
+        background-color: #00d4ff;
+        border-radius: 2px;
+    }
+    QTabWidget::pane {
+        background-color: #16213e;
+        border: 2px solid #0f3460;
+        border-radius: 6px;
+    }
+    QTabBar::tab {
+        background-color: #1a1a2e;
+        color: #a0a0a0;
+        padding: 10px 20px;
+        border-top-left-radius: 4px;
+        border-top-right-radius: 4px;
+    }
+    QTabBar::tab:selected {
+        background-color: #16213e;
+        color: #00d4ff;
+    }
+    QScrollArea {
+        background-color: transparent;
+    }
+    QDialog {
+        background-color: #1a1a2e;
+    }
+"""
+
+
+@lru_cache(maxsize=256)
+def playbook_label(playbook_id: str, prefix: str = "") -> str:
+    """Display label for a playbook id, e.g. "phishing_triage" -> "Phishing Triage"."""
+    return f"{prefix}{playbook_id.replace('_', ' ').title()}"
+
+
+def fill_playbook_list(list_widget: QListWidget, playbooks: list, prefix: str = ""):
+    """Replace the contents of list_widget with playbook items in one batched update."""
+    list_widget.setUpdatesEnabled(False)
+    list_widget.blockSignals(True)
+    try:
+        list_widget.clear()
+        for pb in playbooks:
+            item = QListWidgetItem(playbook_label(pb, prefix))
+            item.setData(Qt.ItemDataRole.UserRole, pb)
+            list_widget.addItem(item)
+    finally:
+        list_widget.blockSignals(False)
+        list_widget.setUpdatesEnabled(True)
+
+
+class WorkerSignals(QObject):
+    """Signals emitted by an AnalysisTask back to the GUI thread."""
     
     finished = pyqtSignal(dict)
     error = pyqtSignal(str)
+    chunk = pyqtSignal(str)
+
+
+class AnalysisTask(QRunnable):
+    """Thread-pool task for background analysis operations."""
     
-    def __init__(self, func, *args, **kwargs):
+    def __init__(self, func, *args, signals: Optional[WorkerSignals] = None, **kwargs):
         super().__init__()
         self.func = func
         self.args = args
         self.kwargs = kwargs
+        self.signals = signals or WorkerSignals()
     
     def run(self):
         try:
             result = self.func(*self.args, **self.kwargs)
-            self.finished.emit(result)
+            self.signals.finished.emit(result)
         except Exception as e:
-            self.error.emit(str(e))
+            self.signals.error.emit(str(e))
+
+
+class AsyncAnalysisRunner:
+    """
+    Runs analysis coroutines on one background asyncio loop.
+    
+    A single thread keeps any number of Gemini requests in flight, instead of
+    tying up one pool thread per network round trip.
+    """
+    
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self.loop.run_forever, name="soc-eater-analysis-loop", daemon=True
+        )
+        self._thread.start()
+    
+    def submit(self, coro, signals: WorkerSignals):
+        """Schedule coro on the loop and report its outcome through signals."""
+        future = asyncio.run_coroutine_threadsafe(coro, self.loop)
+        
+        def on_done(fut):
+            try:
+                signals.finished.emit(fut.result())
+            except Exception as e:
+                signals.error.emit(str(e))
+        
+        future.add_done_callback(on_done)
+    
+    def stop(self):
+        """Stop the loop; pending analyses are abandoned."""
+        self.loop.call_soon_threadsafe(self.loop.stop)
 
 
 class AnalysisWorker:
@@ -64,7 +272,10 @@ class AnalysisWorker:
     def analyze_text(self, prompt: str, context: Optional[dict] = None) -> dict:
         return self.brain.analyze_incident(prompt=prompt, context=context)
     
-    def analyze_with_file(self, prompt: str, file_path: str) -> dict:
+    async def analyze_text_async(self, prompt: str, context: Optional[dict] = None, on_chunk=None) -> dict:
+        return await self.brain.analyze_incident_async(prompt=prompt, context=context, on_chunk=on_chunk)
+    
+    def analyze_with_file(self, prompt: str, file_path: str, on_chunk=None) -> dict:
         """Analyze incident with optional file attachment (image or PCAP)."""
         images = None
         final_prompt = prompt
@@ -73,20 +284,17 @@ class AnalysisWorker:
         
         # Handle images
         if lowered.endswith((".png", ".jpg", ".jpeg", ".webp")):
-            from PIL import Image
-            img = Image.open(file_path).convert("RGB")
-            images = [img]
+            images = [load_image_for_model(file_path)]
         
         # Handle PCAP files
         elif lowered.endswith((".pcap", ".pcapng")):
-            with open(file_path, "rb") as f:
-                pcap_summary = summarize_pcap_bytes(f.read(), max_packets=4000)
+            pcap_summary = summarize_pcap_file(file_path, max_packets=4000)
             final_prompt = (
                 f"{prompt}\n\n[PCAP SUMMARY]\n{pcap_summary}\n\n"
                 "Use the PCAP SUMMARY to extract IOCs, timeline, and likely attack narrative."
             )
         
-        return self.brain.analyze_incident(prompt=final_prompt, images=images)
+        return self.brain.analyze_incident(prompt=final_prompt, images=images, on_chunk=on_chunk)
     
     def run_playbook(self, playbook_name: str, incident_data: dict) -> dict:
         return self.brain.run_playbook(playbook_name, incident_data)
@@ -95,8 +303,9 @@ class AnalysisWorker:
 class SettingsDialog(QDialog):
     """Settings dialog for API key and preferences."""
     
-    def __init__(self, parent=None):
+    def __init__(self, parent=None, bypass_cache: bool = False):
         super().__init__(parent)
+        self.bypass_cache = bypass_cache
         self.setWindowTitle("Settings - SOC-EATER v2")
         self.setMinimumWidth(500)
         self.resize(500, 300)
@@ -130,6 +339,11 @@ class SettingsDialog(QDialog):
         self.auto_save_check.setChecked(True)
         layout.addRow("Auto-save reports:", self.auto_save_check)
         
+        # Analysis cache
+        self.bypass_cache_check = QCheckBox("Always query Gemini, even for repeated prompts")
+        self.bypass_cache_check.setChecked(self.bypass_cache)
+        layout.addRow("Bypass cache:", self.bypass_cache_check)
+        
         # Default model
         self.model_label = QLabel("gemini-1.5-flash (1M token context)")
         layout.addRow("Model:", self.model_label)
@@ -146,7 +360,8 @@ class SettingsDialog(QDialog):
         return {
             "api_key": self.api_key_edit.text(),
             "theme": self.theme_combo.currentText().lower(),
-            "auto_save": self.auto_save_check.isChecked()
+            "auto_save": self.auto_save_check.isChecked(),
+            "bypass_cache": self.bypass_cache_check.isChecked()
         }
 
 
@@ -168,11 +383,7 @@ class PlaybookDialog(QDialog):
         self.playbook_list = QListWidget()
         self.playbook_list.setSelectionMode(QListWidget.SelectionMode.SingleSelection)
         
-        playbooks = self.brain.list_playbooks()
-        for pb in playbooks:
-            item = QListWidgetItem(pb.replace("_", " ").title())
-            item.setData(Qt.ItemDataRole.UserRole, pb)
-            self.playbook_list.addItem(item)
+        fill_playbook_list(self.playbook_list, self.brain.list_playbooks())
         
         layout.addWidget(QLabel("Select a playbook to execute:"))
         layout.addWidget(self.playbook_list)
@@ -215,6 +426,13 @@ class PlaybookDialog(QDialog):
 class ResultHighlighter(QSyntaxHighlighter):
     """Syntax highlighter for analysis results."""
     
+    # Skip highlighting for pathological lines (pasted blobs) and huge reports
+    MAX_BLOCK_LENGTH = 16384
+    MAX_DOCUMENT_CHARS = 500_000
+    
+    # Block state for lines inside a ``` fenced code block
+    CODE_BLOCK_STATE = 1
+    
     def __init__(self, parent):
         super().__init__(parent)
         self.highlighting_rules = []
@@ -238,44 +456,75 @@ class ResultHighlighter(QSyntaxHighlighter):
         
         severity_formats["LOW"].setForeground(QColor("#6bcb77"))
         
-        for severity, fmt in severity_formats.items():
-            self.highlighting_rules.append((f"\\b{severity}\\b", fmt))
+        # One alternation covers every severity keyword in a single pass
+        self.severity_formats = severity_formats
+        self.severity_pattern = re.compile(
+            r"\b(" + "|".join(severity_formats) + r")\b"
+        )
         
         # MITRE ATT&CK
         mitre_fmt = QTextCharFormat()
         mitre_fmt.setForeground(QColor("#00d4ff"))
         mitre_fmt.setFontFamily("monospace")
-        self.highlighting_rules.append((r"T\d{4}(?:\.\d{3})?", mitre_fmt))
+        self.highlighting_rules.append((re.compile(r"T\d{4}(?:\.\d{3})?"), mitre_fmt))
         
         # IPs
         ip_fmt = QTextCharFormat()
         ip_fmt.setForeground(QColor("#ff9f43"))
-        self.highlighting_rules.append((r"\b(?:\d{1,3}\.){3}\d{1,3}\b", ip_fmt))
+        self.highlighting_rules.append((re.compile(r"\b(?:\d{1,3}\.){3}\d{1,3}\b"), ip_fmt))
         
         # URLs
         url_fmt = QTextCharFormat()
         url_fmt.setForeground(QColor("#a29bfe"))
         url_fmt.setFontUnderline(True)
-        self.highlighting_rules.append((r"https?://[^\s]+", url_fmt))
+        self.highlighting_rules.append((re.compile(r"https?://[^\s]+"), url_fmt))
         
-        # Code blocks
-        code_fmt = QTextCharFormat()
-        code_fmt.setFontFamily("monospace")
-        code_fmt.setBackground(QColor("#2d2d2d"))
-        self.highlighting_rules.append((r"```[\s\S]*?```", code_fmt))
+        # Code blocks (multi-line, tracked with block state in highlight_code_fences)
+        self.code_format = QTextCharFormat()
+        self.code_format.setFontFamily("monospace")
+        self.code_format.setBackground(QColor("#2d2d2d"))
     
     def highlightBlock(self, text):
+        if len(text) > self.MAX_BLOCK_LENGTH:
+            # Carry fence state through so following blocks stay correct
+            self.setCurrentBlockState(self.previousBlockState())
+            return
+        
+        self.highlight_code_fences(text)
+        
+        for match in self.severity_pattern.finditer(text):
+            self.setFormat(match.start(), match.end() - match.start(), self.severity_formats[match.group(1)])
+        
         for pattern, fmt in self.highlighting_rules:
-            start = text.find(pattern)
-            while start >= 0:
-                length = len(text.match(pattern, start))
-                self.setFormat(start, length, fmt)
-                start = text.find(pattern, start + length)
+            for match in pattern.finditer(text):
+                self.setFormat(match.start(), match.end() - match.start(), fmt)
+    
+    def highlight_code_fences(self, text):
+        """Format ``` fenced regions, continuing from the previous block's state."""
+        in_code = self.previousBlockState() == self.CODE_BLOCK_STATE
+        start = 0
+        
+        index = text.find("```")
+        while index >= 0:
+            if in_code:
+                self.setFormat(start, index + 3 - start, self.code_format)
+            else:
+                start = index
+            in_code = not in_code
+            index = text.find("```", index + 3)
+        
+        if in_code:
+            self.setFormat(start, len(text) - start, self.code_format)
+        
+        self.setCurrentBlockState(self.CODE_BLOCK_STATE if in_code else 0)
 
 
 class SOCEaterDesktop(QMainWindow):
     """Main desktop application window."""
     
+    # Tab indices
+    ANALYZE_TAB, PLAYBOOKS_TAB, HISTORY_TAB, STATS_TAB = range(4)
+    
     def __init__(self):
         super().__init__()
         self.setWindowTitle("SOC-EATER v2 - Security Operations Analysis")
@@ -284,8 +533,14 @@ class SOCEaterDesktop(QMainWindow):
         
         self.brain: Optional[SOCBrain] = None
         self.worker: Optional[AnalysisWorker] = None
-        self.current_thread: Optional[QThread] = None
         self.uploaded_file: Optional[str] = None
+        self.bypass_cache = False
+        self.analysis_in_progress = False
+        self.async_runner = AsyncAnalysisRunner()
+        
+        # Reused worker threads for playbooks and file-backed analyses
+        self.pool = QThreadPool.globalInstance()
+        self.pool.setMaxThreadCount(4)
         
         self.setup_theme()
         self.setup_ui()
@@ -298,148 +553,7 @@ class SOCEaterDesktop(QMainWindow):
     
     def setup_theme(self):
         """Apply dark theme stylesheet."""
-        self.setStyleSheet("""
-            QMainWindow {
-                background-color: #1a1a2e;
-            }
-            QWidget {
-                background-color: #1a1a2e;
-                color: #e0e0e0;
-                font-family: 'Segoe UI', 'SF Pro Display', -apple-system, sans-serif;
-                font-size: 14px;
-            }
-            QMenuBar {
-                background-color: #16213e;
-                color: #e0e0e0;
-                padding: 8px;
-            }
-            QMenuBar::item:selected {
-                background-color: #0f3460;
-            }
-            QMenu {
-                background-color: #16213e;
-                color: #e0e0e0;
-                border: 1px solid #0f3460;
-            }
-            QMenu::item:selected {
-                background-color: #0f3460;
-            }
-            QToolBar {
-                background-color: #16213e;
-                border: none;
-                padding: 8px;
-                spacing: 8px;
-            }
-            QToolButton {
-                background-color: transparent;
-                color: #e0e0e0;
-                padding: 8px 12px;
-                border-radius: 4px;
-            }
-            QToolButton:hover {
-                background-color: #0f3460;
-            }
-            QStatusBar {
-                background-color: #16213e;
-                color: #a0a0a0;
-            }
-            QLabel {
-                color: #b0b0b0;
-            }
-            QLineEdit, QTextEdit, QComboBox {
-                background-color: #16213e;
-                color: #e0e0e0;
-                border: 2px solid #0f3460;
-                border-radius: 6px;
-                padding: 10px;
-                selection-background-color: #0f3460;
-            }
-            QLineEdit:focus, QTextEdit:focus, QComboBox:focus {
-                border-color: #00d4ff;
-            }
-            QPushButton {
-                background-color: #0f3460;
-                color: #e0e0e0;
-                border: none;
-                border-radius: 6px;
-                padding: 10px 20px;
-                font-weight: 600;
-            }
-            QPushButton:hover {
-                background-color: #1a4a7a;
-            }
-            QPushButton:pressed {
-                background-color: #0a2a50;
-            }
-            QPushButton:disabled {
-                background-color: #2a2a3e;
-                color: #666;
-            }
-            QPushButton.primary {
-                background-color: #00d4ff;
-                color: #1a1a2e;
-            }
-            QPushButton.primary:hover {
-                background-color: #00b8e6;
-            }
-            QGroupBox {
-                background-color: #16213e;
-                border: 2px solid #0f3460;
-                border-radius: 8px;
-                margin-top: 16px;
-                padding-top: 16px;
-                font-weight: 600;
-            }
-            QGroupBox::title {
-                subcontrol-origin: margin;
-                left: 12px;
-                padding: 0 8px;
-                color: #00d4ff;
-            }
-            QListWidget {
-                background-color: #16213e;
-                border: 2px solid #0f3460;
-                border-radius: 6px;
-                color: #e0e0e0;
-            }
-            QListWidget::item:selected {
-                background-color: #0f3460;
-                color: #00d4ff;
-            }
-            QProgressBar {
-                background-color: #16213e;
-                border: 2px solid #0f3460;
-                border-radius: 4px;
-                text-align: center;
-                color: #e0e0e0;
-            }
-            QProgressBar::chunk {
-                background-color: #00d4ff;
-                border-radius: 2px;
-            }
-            QTabWidget::pane {
-                background-color: #16213e;
-                border: 2px solid #0f3460;
-                border-radius: 6px;
-            }
-            QTabBar::tab {
-                background-color: #1a1a2e;
-                color: #a0a0a0;
-                padding: 10px 20px;
-                border-top-left-radius: 4px;
-                border-top-right-radius: 4px;
-            }
-            QTabBar::tab:selected {
-                background-color: #16213e;
-                color: #00d4ff;
-            }
-            QScrollArea {
-                background-color: transparent;
-            }
-            QDialog {
-                background-color: #1a1a2e;
-            }
-        """)
+        self.setStyleSheet(APP_STYLESHEET)
     
     def setup_ui(self):
         """Set up the main user interface."""
@@ -458,11 +572,31 @@ class SOCEaterDesktop(QMainWindow):
         self.tabs.setDocumentMode(True)
         main_layout.addWidget(self.tabs)
         
-        # Create tabs
+        # Create tabs; all but Analyze are built on first activation
+        self._pending_tabs = {}
         self.create_analyze_tab()
-        self.create_playbooks_tab()
-        self.create_history_tab()
-        self.create_stats_tab()
+        self.add_lazy_tab(self.create_playbooks_tab, "📋 Playbooks")
+        self.add_lazy_tab(self.create_history_tab, "📜 History")
+        self.add_lazy_tab(self.create_stats_tab, "📊 Statistics")
+        self.tabs.currentChanged.connect(self.ensure_tab_built)
+    
+    def add_lazy_tab(self, builder, title: str):
+        """Add a placeholder tab whose content is created by builder on first use."""
+        placeholder = QWidget()
+        QVBoxLayout(placeholder).setContentsMargins(0, 0, 0, 0)
+        index = self.tabs.addTab(placeholder, title)
+        self._pending_tabs[index] = builder
+    
+    def ensure_tab_built(self, index: int):
+        """Build a lazily created tab the first time it is shown or needed."""
+        builder = self._pending_tabs.pop(index, None)
+        if builder is None:
+            return
+        self.tabs.widget(index).layout().addWidget(builder())
+    
+    def is_tab_built(self, index: int) -> bool:
+        """Whether the tab at index has had its content created."""
+        return index not in self._pending_tabs
     
     def create_header(self, layout: QVBoxLayout):
         """Create application header."""
@@ -540,7 +674,14 @@ class SOCEaterDesktop(QMainWindow):
             "Data Exfiltration",
             "Custom Incident"
         ])
-        template_combo.currentTextChanged.connect(self.load_template)
+        
+        # Debounce selection so only the final template gets loaded
+        self._pending_template = ""
+        self._template_timer = QTimer(self)
+        self._template_timer.setSingleShot(True)
+        self._template_timer.setInterval(100)
+        self._template_timer.timeout.connect(lambda: self.load_template(self._pending_template))
+        template_combo.currentTextChanged.connect(self.schedule_template)
         input_group_layout.addWidget(template_combo)
         
         # Input text area
@@ -556,6 +697,11 @@ class SOCEaterDesktop(QMainWindow):
         # File upload
         file_layout = QHBoxLayout()
         
+        self.file_preview_label = QLabel()
+        self.file_preview_label.setFixedSize(48, 48)
+        self.file_preview_label.setVisible(False)
+        file_layout.addWidget(self.file_preview_label)
+        
         self.file_path_label = QLabel("No file selected")
         self.file_path_label.setStyleSheet("color: #a0a0a0; font-style: italic;")
         file_layout.addWidget(self.file_path_label, stretch=1)
@@ -611,7 +757,7 @@ class SOCEaterDesktop(QMainWindow):
         results_group_layout = QVBoxLayout()
         
         # Results text area with syntax highlighting
-        self.results_text = QTextEdit()
+        self.results_text = QPlainTextEdit()
         self.results_text.setPlaceholderText(
             "Analysis results will appear here...\n\n"
             "The report includes:\n"
@@ -623,7 +769,16 @@ class SOCEaterDesktop(QMainWindow):
             "• Remediation Recommendations"
         )
         self.results_text.setReadOnly(True)
+        self.results_text.setMaximumBlockCount(5000)
         self.results_text.setFont(QFont("SF Mono", 11))
+        self.highlighter = ResultHighlighter(self.results_text.document())
+        
+        # Incremental output is buffered and flushed at most every 50 ms
+        self._pending_results = []
+        self._results_flush_timer = QTimer(self)
+        self._results_flush_timer.setSingleShot(True)
+        self._results_flush_timer.setInterval(50)
+        self._results_flush_timer.timeout.connect(self.flush_results)
         results_group_layout.addWidget(self.results_text)
         
         # Action buttons
@@ -670,6 +825,7 @@ class SOCEaterDesktop(QMainWindow):
         
         self.playbook_list = QListWidget()
         self.playbook_list.setSelectionMode(QListWidget.SelectionMode.SingleSelection)
+        self.playbook_list.itemSelectionChanged.connect(self.on_playbook_selected)
         left_layout.addWidget(self.playbook_list)
         
         layout.addWidget(left_panel)
@@ -682,7 +838,7 @@ class SOCEaterDesktop(QMainWindow):
         details_group = QGroupBox("Playbook Details")
         details_layout = QVBoxLayout()
         
-        self.playbook_details = QTextEdit()
+        self.playbook_details = QPlainTextEdit()
         self.playbook_details.setReadOnly(True)
         self.playbook_details.setMaximumHeight(200)
         details_layout.addWidget(self.playbook_details)
@@ -709,7 +865,7 @@ class SOCEaterDesktop(QMainWindow):
         right_layout.addWidget(exec_group)
         
         # Results area
-        self.playbook_results = QTextEdit()
+        self.playbook_results = QPlainTextEdit()
         self.playbook_results.setPlaceholderText("Playbook execution results will appear here...")
         self.playbook_results.setReadOnly(True)
         right_layout.addWidget(self.playbook_results)
@@ -718,7 +874,8 @@ class SOCEaterDesktop(QMainWindow):
         layout.setStretch(0, 1)
         layout.setStretch(1, 2)
         
-        self.tabs.addTab(tab, "📋 Playbooks")
+        self.refresh_playbooks()
+        return tab
     
     def create_history_tab(self):
         """Create analysis history tab."""
@@ -733,7 +890,7 @@ class SOCEaterDesktop(QMainWindow):
         self.history_list.setSelectionMode(QListWidget.SelectionMode.SingleSelection)
         layout.addWidget(self.history_list)
         
-        self.tabs.addTab(tab, "📜 History")
+        return tab
     
     def create_stats_tab(self):
         """Create statistics tab."""
@@ -802,7 +959,8 @@ class SOCEaterDesktop(QMainWindow):
         layout.addLayout(stats_grid)
         layout.addStretch()
         
-        self.tabs.addTab(tab, "📊 Statistics")
+        self.update_stats()
+        return tab
     
     def setup_menus(self):
         """Set up application menus."""
@@ -923,23 +1081,14 @@ class SOCEaterDesktop(QMainWindow):
     
     def refresh_playbooks(self):
         """Refresh the playbooks list."""
-        if not self.brain:
+        if not self.brain or not self.is_tab_built(self.PLAYBOOKS_TAB):
             return
         
-        self.playbook_list.clear()
-        playbooks = self.brain.list_playbooks()
-        
-        for pb in playbooks:
-            item = QListWidgetItem(f"📋 {pb.replace('_', ' ').title()}")
-            item.setData(Qt.ItemDataRole.UserRole, pb)
-            self.playbook_list.addItem(item)
-        
-        # Connect selection change
-        self.playbook_list.itemSelectionChanged.connect(self.on_playbook_selected)
+        fill_playbook_list(self.playbook_list, self.brain.list_playbooks(), prefix="📋 ")
     
     def update_stats(self):
         """Update statistics display."""
-        if not self.brain:
+        if not self.brain or not self.is_tab_built(self.STATS_TAB):
             return
         
         stats = self.brain.get_stats()
@@ -950,6 +1099,11 @@ class SOCEaterDesktop(QMainWindow):
         self.total_cost_inr_label.setText(f"₹{stats.get('total_cost_inr', 0):.2f}")
         self.avg_response_label.setText(f"{stats.get('avg_response_time', 0):.1f}s")
     
+    def schedule_template(self, template_name: str):
+        """Queue a template load, restarting the debounce timer."""
+        self._pending_template = template_name
+        self._template_timer.start()
+    
     def load_template(self, template_name: str):
         """Load a quick template into the input."""
         templates = {
@@ -1046,8 +1200,10 @@ Context:
             
             # Determine file type
             lowered = file_path.lower()
+            self.file_preview_label.setVisible(False)
             if lowered.endswith((".png", ".jpg", ".jpeg", ".webp")):
                 file_type = "📷 Image"
+                self.show_file_preview(file_path)
             elif lowered.endswith((".pcap", ".pcapng")):
                 file_type = "📦 PCAP"
             else:
@@ -1056,14 +1212,38 @@ Context:
             self.file_path_label.setText(f"{file_type} {filename}")
             self.file_path_label.setStyleSheet("color: #00d4ff; font-style: normal;")
     
+    def show_file_preview(self, file_path: str):
+        """Show a thumbnail of an attached image, decoding it at thumbnail size."""
+        reader = QImageReader(file_path)
+        reader.setAutoTransform(True)
+        
+        # Let the decoder scale (JPEG decodes at reduced resolution) instead of
+        # decoding the full image and shrinking it afterwards
+        size = reader.size()
+        if size.isValid():
+            reader.setScaledSize(size.scaled(48, 48, Qt.AspectRatioMode.KeepAspectRatio))
+        
+        image = reader.read()
+        if image.isNull():
+            return
+        
+        self.file_preview_label.setPixmap(QPixmap.fromImage(image))
+        self.file_preview_label.setVisible(True)
+    
     def clear_file(self):
         """Clear the uploaded file."""
         self.uploaded_file = None
+        self.file_preview_label.clear()
+        self.file_preview_label.setVisible(False)
         self.file_path_label.setText("No file selected")
         self.file_path_label.setStyleSheet("color: #a0a0a0; font-style: italic;")
     
     def analyze_incident(self):
         """Start incident analysis."""
+        # Ignore repeat clicks / shortcuts while an analysis is already running
+        if self.analysis_in_progress:
+            return
+        
         if not self.brain:
             QMessageBox.warning(self, "Error", "Please configure API key first")
             self.open_settings()
@@ -1075,69 +1255,108 @@ Context:
             return
         
         # Show progress
+        self.analysis_in_progress = True
         self.analyze_btn.setEnabled(False)
         self.progress_bar.setVisible(True)
         self.progress_bar.setRange(0, 0)  # Indeterminate
         self.statusBar().showMessage("Analyzing incident with Gemini...")
         
-        # Clear previous results
+        # Clear previous results; re-attach highlighting a huge earlier report may have disabled
         self.results_text.clear()
-        
-        # Start worker thread
-        def do_analysis():
-            if self.uploaded_file:
-                return self.worker.analyze_with_file(prompt, self.uploaded_file)
-            else:
-                return self.worker.analyze_text(prompt)
-        
-        self.current_thread = QThread()
-        self.worker_thread = WorkerThread(do_analysis)
-        self.worker_thread.moveToThread(self.current_thread)
-        
-        self.worker_thread.finished.connect(self.on_analysis_complete)
-        self.worker_thread.error.connect(self.on_analysis_error)
-        
-        self.current_thread.started.connect(self.worker_thread.run)
-        self.current_thread.start()
+        if self.highlighter.document() is None:
+            self.highlighter.setDocument(self.results_text.document())
+        
+        # The report is streamed into the results view chunk by chunk
+        signals = WorkerSignals()
+        signals.chunk.connect(self.append_results)
+        signals.finished.connect(self.on_analysis_complete)
+        signals.error.connect(self.on_analysis_error)
+        
+        # Attachments need CPU-bound decoding/summarization, so they run on a pool
+        # thread; text-only analyses are pure network waits on the async loop
+        if self.uploaded_file:
+            self.pool.start(AnalysisTask(
+                self.worker.analyze_with_file, prompt, self.uploaded_file,
+                signals=signals, on_chunk=signals.chunk.emit
+            ))
+        else:
+            self.async_runner.submit(
+                self.worker.analyze_text_async(prompt, on_chunk=signals.chunk.emit), signals
+            )
     
     def on_analysis_complete(self, result: dict):
         """Handle analysis completion."""
-        self.current_thread.quit()
-        self.current_thread.wait()
-        
+        self.analysis_in_progress = False
         self.analyze_btn.setEnabled(True)
         self.progress_bar.setVisible(False)
         
         if "error" in result:
             self.statusBar().showMessage("Analysis failed")
-            self.results_text.setText(f"Error: {result['error']}")
+            self.show_results(f"Error: {result['error']}")
             QMessageBox.critical(self, "Analysis Failed", result['error'])
             return
         
-        # Display results
-        raw_analysis = result.get("raw_analysis", "No analysis returned")
-        self.results_text.setText(raw_analysis)
+        # The report text has already been streamed in; just write out the tail
+        self.flush_results()
+        if self.results_text.document().characterCount() <= 1:
+            self.show_results("No analysis returned")
         
         # Update stats
         self.update_stats()
         
         # Update status
         metadata = result.get("metadata", {})
-        response_time = metadata.get("response_time_seconds", 0)
-        self.statusBar().showMessage(f"Analysis complete in {response_time}s")
+        if metadata.get("cached"):
+            self.statusBar().showMessage("Analysis loaded from cache")
+        else:
+            response_time = metadata.get("response_time_seconds", 0)
+            self.statusBar().showMessage(f"Analysis complete in {response_time}s")
         
         # Add to history (could implement full history later)
     
+    def show_results(self, text: str):
+        """Display text in the results view, skipping highlighting for huge reports."""
+        self._pending_results.clear()
+        if len(text) > ResultHighlighter.MAX_DOCUMENT_CHARS:
+            self.highlighter.setDocument(None)
+        elif self.highlighter.document() is None:
+            self.highlighter.setDocument(self.results_text.document())
+        
+        self.results_text.setPlainText(text)
+    
+    def append_results(self, text: str):
+        """Queue text to be appended to the results view on the next flush."""
+        self._pending_results.append(text)
+        if not self._results_flush_timer.isActive():
+            self._results_flush_timer.start()
+    
+    def flush_results(self):
+        """Append buffered text at the end of the results document in one edit."""
+        if not self._pending_results:
+            return
+        
+        chunk = "".join(self._pending_results)
+        self._pending_results.clear()
+        
+        # Stop highlighting once a streamed report grows past the size guard
+        document = self.results_text.document()
+        if (self.highlighter.document() is not None
+                and document.characterCount() + len(chunk) > ResultHighlighter.MAX_DOCUMENT_CHARS):
+            self.highlighter.setDocument(None)
+        
+        # Insert through a cursor so only the new text is laid out and highlighted
+        cursor = QTextCursor(document)
+        cursor.movePosition(QTextCursor.MoveOperation.End)
+        cursor.insertText(chunk)
+    
     def on_analysis_error(self, error: str):
         """Handle analysis error."""
-        self.current_thread.quit()
-        self.current_thread.wait()
-        
+        self.analysis_in_progress = False
         self.analyze_btn.setEnabled(True)
         self.progress_bar.setVisible(False)
         
         self.statusBar().showMessage("Analysis failed")
-        self.results_text.setText(f"Error: {error}")
+        self.show_results(f"Error: {error}")
         QMessageBox.critical(self, "Analysis Failed", error)
     
     def open_playbook_dialog(self):
@@ -1163,41 +1382,31 @@ Context:
         def do_playbook():
             return self.worker.run_playbook(playbook_name, incident_data)
         
-        self.current_thread = QThread()
-        self.worker_thread = WorkerThread(do_playbook)
-        self.worker_thread.moveToThread(self.current_thread)
-        
-        self.worker_thread.finished.connect(self.on_playbook_complete)
-        self.worker_thread.error.connect(self.on_playbook_error)
-        
-        self.current_thread.started.connect(self.worker_thread.run)
-        self.current_thread.start()
+        task = AnalysisTask(do_playbook)
+        task.signals.finished.connect(self.on_playbook_complete)
+        task.signals.error.connect(self.on_playbook_error)
+        self.pool.start(task)
     
     def on_playbook_complete(self, result: dict):
         """Handle playbook completion."""
-        self.current_thread.quit()
-        self.current_thread.wait()
-        
         if "error" in result:
             self.statusBar().showMessage("Playbook execution failed")
             QMessageBox.critical(self, "Playbook Failed", result['error'])
             return
         
         # Display results in playbook tab
+        self.ensure_tab_built(self.PLAYBOOKS_TAB)
         raw_analysis = result.get("raw_analysis", "No results returned")
-        self.playbook_results.setText(raw_analysis)
+        self.playbook_results.setPlainText(raw_analysis)
         
         # Switch to playbook tab
-        self.tabs.setCurrentIndex(1)  # Playbooks tab
+        self.tabs.setCurrentIndex(self.PLAYBOOKS_TAB)
         
         self.statusBar().showMessage("Playbook executed successfully")
         self.update_stats()
     
     def on_playbook_error(self, error: str):
         """Handle playbook error."""
-        self.current_thread.quit()
-        self.current_thread.wait()
-        
         self.statusBar().showMessage("Playbook execution failed")
         QMessageBox.critical(self, "Playbook Failed", error)
     
@@ -1215,7 +1424,7 @@ Context:
             details += f"Description: {playbook.get('description', 'N/A')}\n\n"
             details += f"Steps: {len(playbook.get('steps', []))} steps defined"
             
-            self.playbook_details.setText(details)
+            self.playbook_details.setPlainText(details)
     
     def execute_selected_playbook(self):
         """Execute the currently selected playbook."""
@@ -1281,17 +1490,25 @@ Context:
     
     def open_settings(self):
         """Open settings dialog."""
-        dialog = SettingsDialog(self)
+        dialog = SettingsDialog(self, bypass_cache=self.bypass_cache)
         if dialog.exec() == QDialog.DialogCode.Accepted:
             settings = dialog.get_settings()
+            self.bypass_cache = settings["bypass_cache"]
             
-            # Save API key to environment
-            if settings["api_key"]:
-                os.environ["GEMINI_API_KEY"] = settings["api_key"]
+            # Rebuild the brain only for a new key; a rebuild resets session stats
+            api_key = settings["api_key"]
+            if api_key and (self.brain is None or api_key != self.brain.api_key):
+                os.environ["GEMINI_API_KEY"] = api_key
                 
                 # Reinitialize brain
                 try:
-                    self.brain = SOCBrain(api_key=settings["api_key"])
+                    brain = SOCBrain(api_key=api_key)
+                except Exception as e:
+                    QMessageBox.critical(self, "Configuration Error", str(e))
+                else:
+                    if self.brain and self.brain.cache:
+                        self.brain.cache.close()
+                    self.brain = brain
                     self.worker = AnalysisWorker(self.brain)
                     self.status_indicator.setText("●")
                     self.status_indicator.setStyleSheet("font-size: 16px; color: #6bcb77;")
@@ -1300,8 +1517,13 @@ Context:
                     self.statusBar().showMessage("API key configured successfully")
                     self.refresh_playbooks()
                     self.update_stats()
-                except Exception as e:
-                    QMessageBox.critical(self, "Configuration Error", str(e))
+            elif self.brain:
+                # Pick up edited playbook files without reconnecting
+                self.brain.reload_playbooks()
+                self.refresh_playbooks()
+            
+            if self.brain:
+                self.brain.cache_enabled = not self.bypass_cache
     
     def show_about(self):
         """Show about dialog."""
@@ -1343,6 +1565,11 @@ Context:
             
             These files are located in the project directory."""
         )
+    
+    def closeEvent(self, event):
+        """Stop the background analysis loop when the window closes."""
+        self.async_runner.stop()
+        super().closeEvent(event)
 
 
 def main():
@@ -8,7 +8,9 @@ Run:
 
 from __future__ import annotations
 
+import asyncio
 import io
+import json
 import os
 from typing import Any, Optional
 
@@ -17,10 +19,10 @@ from fastapi.responses import JSONResponse
 from pydantic import BaseModel
 
 import gradio as gr
-from PIL import Image
 
 from soc_eater_v2.soc_brain import SOCBrain
-from soc_eater_v2.utils.pcap_parser import summarize_pcap_bytes
+from soc_eater_v2.utils.image_loader import load_image_for_model
+from soc_eater_v2.utils.pcap_parser import summarize_pcap_bytes, summarize_pcap_file
 
 
 class AnalyzeJSONRequest(BaseModel):
@@ -45,8 +47,8 @@ def create_app() -> FastAPI:
         return {"playbooks": brain.list_playbooks()}
 
     @app.post("/playbooks/{playbook_id}/run")
-    def run_playbook(playbook_id: str, body: RunPlaybookRequest) -> JSONResponse:
-        result = brain.run_playbook(playbook_id, body.incident_data)
+    async def run_playbook(playbook_id: str, body: RunPlaybookRequest) -> JSONResponse:
+        result = await brain.run_playbook_async(playbook_id, body.incident_data)
         return JSONResponse(result)
 
     @app.get("/stats")
@@ -54,10 +56,23 @@ def create_app() -> FastAPI:
         return brain.get_stats()
 
     @app.post("/analyze_json")
-    def analyze_json(body: AnalyzeJSONRequest) -> JSONResponse:
-        result = brain.analyze_incident(prompt=body.prompt, context=body.context)
+    async def analyze_json(body: AnalyzeJSONRequest) -> JSONResponse:
+        result = await brain.analyze_incident_async(prompt=body.prompt, context=body.context)
         return JSONResponse(result)
 
+    @app.post("/analyze_batch")
+    def analyze_batch(body: list[AnalyzeJSONRequest]) -> JSONResponse:
+        if len(body) > brain.MAX_BATCH_ITEMS:
+            return JSONResponse(
+                {"error": f"At most {brain.MAX_BATCH_ITEMS} incidents can be analyzed per batch"},
+                status_code=413,
+            )
+        results = brain.analyze_incidents_batch(
+            prompts=[item.prompt for item in body],
+            contexts=[item.context for item in body],
+        )
+        return JSONResponse({"results": results})
+
     @app.post("/analyze")
     async def analyze(
         prompt: str = Form(...),
@@ -66,8 +81,6 @@ def create_app() -> FastAPI:
     ) -> JSONResponse:
         context = None
         if context_json:
-            import json
-
             try:
                 context = json.loads(context_json)
             except Exception:
@@ -80,14 +93,15 @@ def create_app() -> FastAPI:
             content_type = (file.content_type or "").lower()
 
             if content_type.startswith("image/") or filename.endswith((".png", ".jpg", ".jpeg", ".webp")):
-                img = Image.open(io.BytesIO(content)).convert("RGB")
+                # Decoding is CPU-bound; keep it off the event loop
+                img = await asyncio.to_thread(load_image_for_model, io.BytesIO(content))
                 images = [img]
 
             elif filename.endswith((".pcap", ".pcapng")) or content_type in {
                 "application/vnd.tcpdump.pcap",
                 "application/octet-stream",
             }:
-                pcap_summary = summarize_pcap_bytes(content, max_packets=4000)
+                pcap_summary = await asyncio.to_thread(summarize_pcap_bytes, content, 4000)
                 prompt = (
                     f"{prompt}\n\n[PCAP SUMMARY]\n{pcap_summary}\n\n"
                     "Use the PCAP SUMMARY to extract IOCs, timeline, and likely attack narrative."
@@ -99,7 +113,7 @@ def create_app() -> FastAPI:
                     "The attachment could not be parsed. Proceed using all available context."
                 )
 
-        result = brain.analyze_incident(prompt=prompt, context=context, images=images)
+        result = await brain.analyze_incident_async(prompt=prompt, context=context, images=images)
         return JSONResponse(result)
 
     def gradio_analyze(user_prompt: str, upload: Any):
@@ -110,18 +124,24 @@ def create_app() -> FastAPI:
             path = upload
             lowered = path.lower()
             if lowered.endswith((".png", ".jpg", ".jpeg", ".webp")):
-                img = Image.open(path).convert("RGB")
-                images = [img]
+                images = [load_image_for_model(path)]
             elif lowered.endswith((".pcap", ".pcapng")):
-                with open(path, "rb") as f:
-                    pcap_summary = summarize_pcap_bytes(f.read(), max_packets=4000)
+                pcap_summary = summarize_pcap_file(path, max_packets=4000)
                 prompt = (
                     f"{prompt}\n\n[PCAP SUMMARY]\n{pcap_summary}\n\n"
                     "Use the PCAP SUMMARY to extract IOCs, timeline, and likely attack narrative."
                 )
 
-        result = brain.analyze_incident(prompt=prompt, images=images)
-        return result.get("raw_analysis", "")
+        # Stream the report so the first lines render while Gemini is still generating
+        stream = brain.analyze_incident_stream(prompt=prompt, images=images)
+        accumulated = ""
+        for chunk in stream:
+            accumulated += chunk
+            yield accumulated
+
+        result = stream.result
+        if "error" in result:
+            yield f"{accumulated}\n\n**Analysis failed:** {result['error']}"
 
     # Create a more professional, production-grade interface
     with gr.Blocks(theme=gr.themes.Soft()) as demo:
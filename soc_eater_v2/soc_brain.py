@@ -4,14 +4,49 @@ Powered by Gemini 1.5 Flash for autonomous security operations
 """
 
 import os
+import re
 import json
+import asyncio
 import time
-from typing import Dict, List, Optional, Any
+from typing import Any, Callable, Dict, Generator, List, Optional
 from pathlib import Path
 from datetime import datetime
 
 import yaml
 
+from soc_eater_v2.utils.analysis_cache import AnalysisCache
+from soc_eater_v2.utils.rate_limiter import TokenBucket
+
+
+# Default location of the persistent analysis cache (override with SOC_EATER_CACHE_PATH)
+DEFAULT_CACHE_PATH = Path.home() / ".soc_eater" / "analysis_cache.sqlite3"
+
+
+# IOC / MITRE extraction patterns, compiled once at import
+_MITRE_TECHNIQUE_RE = re.compile(r'T\d{4}(?:\.\d{3})?')
+_IP_RE = re.compile(r'\b(?:\d{1,3}\.){3}\d{1,3}\b')
+_DOMAIN_RE = re.compile(r'\b[a-z0-9\-]+\.[a-z]{2,}\b')
+_HASH_RE = re.compile(r'\b[a-f0-9]{32,64}\b')
+
+# Per-incident header used to split batched responses ("### INCIDENT 3 ###")
+_BATCH_HEADER_RE = re.compile(r'^#{1,6}\s*INCIDENT\s+(\d+)\b.*$', re.MULTILINE)
+
+
+class AnalysisStream:
+    """
+    Iterable over the text chunks of a streamed analysis.
+    
+    Once iteration finishes, result holds the same dict analyze_incident
+    would have returned.
+    """
+    
+    def __init__(self, chunks: Generator[str, None, Dict[str, Any]]):
+        self._chunks = chunks
+        self.result: Optional[Dict[str, Any]] = None
+    
+    def __iter__(self):
+        self.result = yield from self._chunks
+
 
 class SOCBrain:
     """
@@ -19,6 +54,16 @@ class SOCBrain:
     Uses Gemini 1.5 Flash for ultra-fast, cost-effective incident analysis.
     """
     
+    # Incidents per batched model call; three full reports fit within the
+    # model's 8192-token output limit, more get truncated
+    MAX_BATCH_SIZE = 3
+    
+    # Default per-minute limit on batched model calls
+    DEFAULT_BATCH_CALLS_PER_MINUTE = 15
+    
+    # Most incidents accepted by one analyze_incidents_batch() call
+    MAX_BATCH_ITEMS = 8 * MAX_BATCH_SIZE
+    
     def __init__(self, api_key: Optional[str] = None):
         """Initialize the SOC Brain with Gemini 1.5 Flash"""
         self.api_key = api_key or os.getenv("GEMINI_API_KEY")
@@ -36,7 +81,15 @@ class SOCBrain:
         self.model = genai.GenerativeModel('gemini-1.5-flash')
         
         # Load playbooks
-        self.playbooks = self._load_playbooks()
+        self.playbook_dir = Path(__file__).parent / "playbooks"
+        self.reload_playbooks()
+        
+        # Persistent cache for repeated text-only analyses
+        self.cache_enabled = True
+        self.cache = self._open_cache()
+        
+        # Per-minute throttle on batched model calls
+        self.batch_throttle = self._open_batch_throttle()
         
         # Statistics
         self.stats = {
@@ -49,7 +102,7 @@ class SOCBrain:
     def _load_playbooks(self) -> Dict[str, Any]:
         """Load all YAML playbooks from the playbooks directory"""
         playbooks = {}
-        playbook_dir = Path(__file__).parent / "playbooks"
+        playbook_dir = self.playbook_dir
         
         if not playbook_dir.exists():
             return {}
@@ -64,21 +117,186 @@ class SOCBrain:
         
         return playbooks
     
+    def _open_cache(self) -> Optional[AnalysisCache]:
+        """Open the analysis cache; SOC_EATER_CACHE_PATH="" disables it"""
+        cache_path = os.getenv("SOC_EATER_CACHE_PATH", str(DEFAULT_CACHE_PATH))
+        if not cache_path:
+            return None
+        
+        try:
+            ttl = int(os.getenv("SOC_EATER_CACHE_TTL", "3600"))
+            return AnalysisCache(cache_path, ttl_seconds=ttl)
+        except Exception as e:
+            print(f"Analysis cache disabled: {e}")
+            return None
+    
+    def _open_batch_throttle(self) -> TokenBucket:
+        """Throttle for batched calls; a bad SOC_EATER_BATCH_CALLS_PER_MINUTE falls back to the default"""
+        try:
+            rate = int(os.getenv("SOC_EATER_BATCH_CALLS_PER_MINUTE", str(self.DEFAULT_BATCH_CALLS_PER_MINUTE)))
+            return TokenBucket(rate)
+        except ValueError as e:
+            print(f"Invalid SOC_EATER_BATCH_CALLS_PER_MINUTE, using {self.DEFAULT_BATCH_CALLS_PER_MINUTE}: {e}")
+            return TokenBucket(self.DEFAULT_BATCH_CALLS_PER_MINUTE)
+    
+    def _playbook_dir_mtime(self) -> int:
+        """Latest modification time of the playbooks directory or any playbook in it (0 if missing)"""
+        try:
+            mtime = self.playbook_dir.stat().st_mtime_ns
+            for playbook_file in self.playbook_dir.glob("*.yaml"):
+                mtime = max(mtime, playbook_file.stat().st_mtime_ns)
+            return mtime
+        except OSError:
+            return 0
+    
     def analyze_incident(
         self,
         prompt: str,
         context: Optional[Dict] = None,
         images: Optional[List[Any]] = None,
-        files: Optional[List[bytes]] = None
+        files: Optional[List[bytes]] = None,
+        use_cache: bool = True,
+        on_chunk: Optional[Callable[[str], None]] = None
     ) -> Dict[str, Any]:
         """
         Main entry point for incident analysis.
         Handles text, images, files, and multimodal inputs.
         
+        Text-only analyses are served from the persistent cache when an
+        identical prompt and context were analyzed within the cache TTL.
+        When on_chunk is given the response is streamed and each text chunk
+        is passed to it as it arrives.
+        
         Returns a complete investigation report.
         """
-        start_time = time.time()
+        if on_chunk is not None:
+            stream = self.analyze_incident_stream(prompt, context, images, files, use_cache)
+            for chunk in stream:
+                on_chunk(chunk)
+            return stream.result
+        
+        cache_key, cached = self._cache_lookup(prompt, context, images, files, use_cache)
+        if cached is not None:
+            return cached
+        
+        return self._generate_analysis(prompt, context, images, cache_key)
+    
+    def _generate_analysis(
+        self,
+        prompt: str,
+        context: Optional[Dict],
+        images: Optional[List[Any]],
+        cache_key: Optional[str]
+    ) -> Dict[str, Any]:
+        """Run one uncached model call and build its result"""
+        start_time = time.perf_counter()
+        inputs = self._build_inputs(prompt, context, images)
+        
+        # Generate response
+        try:
+            response = self.model.generate_content(inputs)
+            return self._complete_analysis(response, start_time, cache_key)
+        except Exception as e:
+            return self._failed_analysis(e)
+    
+    async def analyze_incident_async(
+        self,
+        prompt: str,
+        context: Optional[Dict] = None,
+        images: Optional[List[Any]] = None,
+        files: Optional[List[bytes]] = None,
+        use_cache: bool = True,
+        on_chunk: Optional[Callable[[str], None]] = None
+    ) -> Dict[str, Any]:
+        """
+        Asynchronous variant of analyze_incident.
+        
+        Awaits the Gemini call instead of blocking, so a single event loop can
+        keep many analyses in flight at once. When on_chunk is given the
+        response is streamed and each text chunk is passed to it as it arrives.
+        """
+        # sqlite reads and writes block, so they run off the event loop
+        cache_key = self._cache_key(prompt, context, images, files, use_cache)
+        cached = await asyncio.to_thread(self._cache_get, cache_key) if cache_key else None
+        if cached is not None:
+            if on_chunk is not None:
+                on_chunk(cached.get("raw_analysis", ""))
+            return cached
+        
+        start_time = time.perf_counter()
+        inputs = self._build_inputs(prompt, context, images)
+        
+        try:
+            if on_chunk is None:
+                response = await self.model.generate_content_async(inputs)
+            else:
+                response = await self.model.generate_content_async(inputs, stream=True)
+                async for chunk in response:
+                    on_chunk(chunk.text)
+            result = self._complete_analysis(response, start_time, None)
+        except Exception as e:
+            return self._failed_analysis(e)
+        
+        if cache_key is not None:
+            await asyncio.to_thread(self.cache.put, cache_key, result)
+        return result
+    
+    def analyze_incident_stream(
+        self,
+        prompt: str,
+        context: Optional[Dict] = None,
+        images: Optional[List[Any]] = None,
+        files: Optional[List[bytes]] = None,
+        use_cache: bool = True
+    ) -> AnalysisStream:
+        """
+        Streaming variant of analyze_incident.
+        
+        Iterating the returned stream yields report text chunks as Gemini
+        produces them; its result attribute holds the final analysis.
+        """
+        return AnalysisStream(self._stream_analysis(prompt, context, images, files, use_cache))
+    
+    def _stream_analysis(self, prompt, context, images, files, use_cache) -> Generator[str, None, Dict[str, Any]]:
+        """Generator behind AnalysisStream; returns the result dict when exhausted"""
+        cache_key, cached = self._cache_lookup(prompt, context, images, files, use_cache)
+        if cached is not None:
+            yield cached.get("raw_analysis", "")
+            return cached
         
+        start_time = time.perf_counter()
+        inputs = self._build_inputs(prompt, context, images)
+        
+        try:
+            response = self.model.generate_content(inputs, stream=True)
+            for chunk in response:
+                yield chunk.text
+            return self._complete_analysis(response, start_time, cache_key)
+        except Exception as e:
+            return self._failed_analysis(e)
+    
+    def _cache_lookup(self, prompt, context, images, files, use_cache):
+        """Return (cache_key, cached_result); cache_key is None when caching doesn't apply"""
+        cache_key = self._cache_key(prompt, context, images, files, use_cache)
+        if cache_key is None:
+            return None, None
+        return cache_key, self._cache_get(cache_key)
+    
+    def _cache_key(self, prompt, context, images, files, use_cache) -> Optional[str]:
+        """Cache key for an analysis, or None when caching doesn't apply"""
+        if self.cache is None or not self.cache_enabled or not use_cache or images or files:
+            return None
+        return AnalysisCache.make_key(prompt, context)
+    
+    def _cache_get(self, cache_key: str) -> Optional[Dict[str, Any]]:
+        """Cached result for cache_key, flagged as a cache hit"""
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            cached.setdefault("metadata", {})["cached"] = True
+        return cached
+    
+    def _build_inputs(self, prompt: str, context: Optional[Dict], images: Optional[List[Any]]) -> List[Any]:
+        """Build the multimodal model input list for an analysis"""
         # Build the comprehensive analysis prompt
         system_prompt = self._build_system_prompt()
         full_prompt = f"{system_prompt}\n\n{prompt}"
@@ -93,36 +311,176 @@ class SOCBrain:
         if images:
             inputs.extend(images)
         
-        # Generate response
+        return inputs
+    
+    def _complete_analysis(self, response: Any, start_time: float, cache_key: Optional[str]) -> Dict[str, Any]:
+        """Parse a model response, attach metadata, update stats and cache"""
+        analysis = response.text
+        
+        # Extract structured data from response
+        result = self._parse_analysis(analysis)
+        result["metadata"] = self._build_metadata(response, start_time)
+        self._record_result(result, cache_key)
+        
+        return result
+    
+    def _build_metadata(self, response: Any, start_time: float) -> Dict[str, Any]:
+        """Response metadata with the call's token usage"""
+        elapsed = time.perf_counter() - start_time
+        usage = response.usage_metadata if hasattr(response, 'usage_metadata') else None
+        
+        metadata = {
+            "timestamp": datetime.utcnow().isoformat(),
+            "model": "gemini-1.5-flash",
+            "response_time_seconds": round(elapsed, 2),
+            "prompt_tokens": usage.prompt_token_count if usage else 0,
+            "completion_tokens": usage.candidates_token_count if usage else 0,
+            "total_tokens": usage.total_token_count if usage else 0
+        }
+        return metadata
+    
+    def _split_batch_metadata(self, metadata: Dict[str, Any], count: int, batch_size: int) -> List[Dict[str, Any]]:
+        """
+        Share one batched call's token usage across count recorded results.
+        
+        The first share also takes the integer remainder, so the shares always
+        add up to the full usage of the call.
+        """
+        shares = []
+        for i in range(count):
+            share = dict(metadata, batch_size=batch_size)
+            for key in ("prompt_tokens", "completion_tokens", "total_tokens"):
+                base, remainder = divmod(metadata[key], count)
+                share[key] = base + remainder if i == 0 else base
+            shares.append(share)
+        return shares
+    
+    def _record_result(self, result: Dict[str, Any], cache_key: Optional[str]):
+        """Update stats and the analysis cache for a completed analysis"""
+        self._update_stats(result["metadata"])
+        
+        if cache_key is not None:
+            self.cache.put(cache_key, result)
+    
+    def analyze_incidents_batch(
+        self,
+        prompts: List[str],
+        contexts: Optional[List[Optional[Dict]]] = None,
+        use_cache: bool = True
+    ) -> List[Dict[str, Any]]:
+        """
+        Analyze several text incidents with as few model calls as possible.
+        
+        Uncached incidents are sent MAX_BATCH_SIZE at a time in one prompt and
+        the combined response is split back into one result per incident.
+        Incidents missing from a batched response are re-run on their own.
+        Results are returned in the same order as prompts. Model calls are
+        throttled to the configured per-minute rate, and at most
+        MAX_BATCH_ITEMS incidents are accepted per call.
+        """
+        if len(prompts) > self.MAX_BATCH_ITEMS:
+            raise ValueError(f"At most {self.MAX_BATCH_ITEMS} incidents can be analyzed per batch")
+        if contexts is None:
+            contexts = [None] * len(prompts)
+        if len(contexts) != len(prompts):
+            raise ValueError("contexts must have the same length as prompts")
+        
+        results: List[Optional[Dict[str, Any]]] = [None] * len(prompts)
+        pending = []
+        
+        for index, (prompt, context) in enumerate(zip(prompts, contexts)):
+            cache_key, cached = self._cache_lookup(prompt, context, None, None, use_cache)
+            if cached is not None:
+                results[index] = cached
+            else:
+                pending.append((index, cache_key))
+        
+        for start in range(0, len(pending), self.MAX_BATCH_SIZE):
+            self.batch_throttle.acquire()
+            self._run_batch(pending[start:start + self.MAX_BATCH_SIZE], prompts, contexts, results)
+        
+        return results
+    
+    def _run_batch(self, batch, prompts, contexts, results):
+        """Analyze one batch of (index, cache_key) pairs, filling results in place"""
+        batch_prompt = self._build_batch_prompt(
+            [prompts[index] for index, _ in batch],
+            [contexts[index] for index, _ in batch]
+        )
+        start_time = time.perf_counter()
+        
         try:
-            response = self.model.generate_content(inputs)
-            analysis = response.text
-            
-            # Extract structured data from response
-            result = self._parse_analysis(analysis)
-            
-            # Add metadata
-            elapsed = time.time() - start_time
-            result["metadata"] = {
-                "timestamp": datetime.utcnow().isoformat(),
-                "model": "gemini-1.5-flash",
-                "response_time_seconds": round(elapsed, 2),
-                "prompt_tokens": response.usage_metadata.prompt_token_count if hasattr(response, 'usage_metadata') else 0,
-                "completion_tokens": response.usage_metadata.candidates_token_count if hasattr(response, 'usage_metadata') else 0,
-                "total_tokens": response.usage_metadata.total_token_count if hasattr(response, 'usage_metadata') else 0
-            }
-            
-            # Update stats
-            self._update_stats(result["metadata"])
-            
-            return result
-            
+            response = self.model.generate_content(batch_prompt)
+            sections = self._split_batch_response(response.text)
         except Exception as e:
-            return {
-                "error": str(e),
-                "status": "failed",
-                "timestamp": datetime.utcnow().isoformat()
-            }
+            for index, _ in batch:
+                results[index] = self._failed_analysis(e)
+            return
+        
+        found = []
+        missing = []
+        for position, (index, cache_key) in enumerate(batch, 1):
+            analysis = sections.get(position)
+            if analysis:
+                found.append((index, cache_key, analysis))
+            else:
+                missing.append((index, cache_key))
+        
+        # Usage is split over the incidents actually returned, so dropped
+        # incidents don't make the stats under-report what the call cost
+        metadata = self._build_metadata(response, start_time)
+        if found:
+            shares = self._split_batch_metadata(metadata, len(found), len(batch))
+            for (index, cache_key, analysis), share in zip(found, shares):
+                result = self._parse_analysis(analysis)
+                result["metadata"] = share
+                self._record_result(result, cache_key)
+                results[index] = result
+        else:
+            self._add_usage(metadata)
+        
+        # Truncated or skipped incidents get a call of their own
+        for index, cache_key in missing:
+            self.batch_throttle.acquire()
+            results[index] = self._generate_analysis(prompts[index], contexts[index], None, cache_key)
+    
+    def _build_batch_prompt(self, prompts: List[str], contexts: List[Optional[Dict]]) -> str:
+        """Combine several incidents into one prompt with numbered headers"""
+        parts = [
+            self._build_system_prompt(),
+            "",
+            f"Analyze the following {len(prompts)} incidents independently. Write one complete "
+            "report per incident in the format above, and start each report with its header "
+            "line exactly as given (for example '### INCIDENT 1 ###'). Do not merge or skip incidents."
+        ]
+        
+        for number, (prompt, context) in enumerate(zip(prompts, contexts), 1):
+            parts.append(f"\n### INCIDENT {number} ###\n{prompt}")
+            if context:
+                parts.append(f"\nAdditional Context:\n{json.dumps(context, indent=2)}")
+        
+        return "\n".join(parts)
+    
+    def _split_batch_response(self, text: str) -> Dict[int, str]:
+        """Split a batched response into {incident number: report text}"""
+        sections = {}
+        headers = list(_BATCH_HEADER_RE.finditer(text))
+        
+        for i, header in enumerate(headers):
+            end = headers[i + 1].start() if i + 1 < len(headers) else len(text)
+            number = int(header.group(1))
+            # Keep the first report if the model repeats a header
+            sections.setdefault(number, text[header.end():end].strip())
+        
+        return sections
+    
+    def _failed_analysis(self, error: Exception) -> Dict[str, Any]:
+        """Build the error result returned when the model call fails"""
+        return {
+            "error": str(error),
+            "status": "failed",
+            "timestamp": datetime.utcnow().isoformat()
+        }
     
     def _build_system_prompt(self) -> str:
         """Build the comprehensive system prompt for SOC analysis"""
@@ -237,8 +595,7 @@ Be thorough, accurate, and actionable. Your analysis will be used directly by se
             if end > start:
                 techniques_section = analysis_text[start:end]
                 # Simple extraction - look for T#### patterns
-                import re
-                mitre_techniques = re.findall(r'T\d{4}(?:\.\d{3})?', techniques_section)
+                mitre_techniques = _MITRE_TECHNIQUE_RE.findall(techniques_section)
         
         result["mitre_techniques"] = mitre_techniques
         
@@ -252,19 +609,16 @@ Be thorough, accurate, and actionable. Your analysis will be used directly by se
         }
         
         if "INDICATORS OF COMPROMISE" in analysis_text:
-            import re
+            lowered = analysis_text.lower()
             
             # Extract IPs
-            ip_pattern = r'\b(?:\d{1,3}\.){3}\d{1,3}\b'
-            iocs["ips"] = list(set(re.findall(ip_pattern, analysis_text)))
+            iocs["ips"] = list(set(_IP_RE.findall(analysis_text)))
             
             # Extract domains (simple pattern)
-            domain_pattern = r'\b[a-z0-9\-]+\.[a-z]{2,}\b'
-            iocs["domains"] = list(set(re.findall(domain_pattern, analysis_text.lower())))
+            iocs["domains"] = list(set(_DOMAIN_RE.findall(lowered)))
             
             # Extract hashes (MD5, SHA1, SHA256)
-            hash_pattern = r'\b[a-f0-9]{32,64}\b'
-            iocs["hashes"] = list(set(re.findall(hash_pattern, analysis_text.lower())))
+            iocs["hashes"] = list(set(_HASH_RE.findall(lowered)))
         
         result["iocs"] = iocs
         
@@ -273,6 +627,15 @@ Be thorough, accurate, and actionable. Your analysis will be used directly by se
     def _update_stats(self, metadata: Dict):
         """Update internal statistics"""
         self.stats["total_analyses"] += 1
+        self._add_usage(metadata)
+        
+        # Update avg response time
+        current_avg = self.stats["avg_response_time"]
+        new_time = metadata.get("response_time_seconds", 0)
+        self.stats["avg_response_time"] = (current_avg * (self.stats["total_analyses"] - 1) + new_time) / self.stats["total_analyses"]
+    
+    def _add_usage(self, metadata: Dict):
+        """Add a call's tokens and cost to the statistics"""
         self.stats["total_tokens"] += metadata.get("total_tokens", 0)
         
         # Gemini 1.5 Flash pricing: $0.00035 per 1K tokens (input), $0.00105 per 1K tokens (output)
@@ -281,19 +644,27 @@ Be thorough, accurate, and actionable. Your analysis will be used directly by se
         
         cost = (prompt_tokens / 1000 * 0.00035) + (completion_tokens / 1000 * 0.00105)
         self.stats["total_cost_usd"] += cost
-        
-        # Update avg response time
-        current_avg = self.stats["avg_response_time"]
-        new_time = metadata.get("response_time_seconds", 0)
-        self.stats["avg_response_time"] = (current_avg * (self.stats["total_analyses"] - 1) + new_time) / self.stats["total_analyses"]
     
     def get_playbook(self, playbook_name: str) -> Optional[Dict]:
         """Get a specific playbook by name"""
         return self.playbooks.get(playbook_name)
     
     def list_playbooks(self) -> List[str]:
-        """List all available playbooks"""
-        return list(self.playbooks.keys())
+        """
+        List all available playbooks.
+        
+        The name list is cached and only rebuilt (with a reload from disk) when
+        playbooks are added, removed or edited.
+        """
+        if self._playbook_dir_mtime() != self._playbooks_mtime:
+            self.reload_playbooks()
+        return list(self._playbook_names)
+    
+    def reload_playbooks(self):
+        """Re-read all playbooks from disk"""
+        self._playbooks_mtime = self._playbook_dir_mtime()
+        self.playbooks = self._load_playbooks()
+        self._playbook_names = list(self.playbooks.keys())
     
     def run_playbook(self, playbook_name: str, incident_data: Dict) -> Dict[str, Any]:
         """Execute a specific playbook with incident data"""
@@ -302,8 +673,22 @@ Be thorough, accurate, and actionable. Your analysis will be used directly by se
         if not playbook:
             return {"error": f"Playbook '{playbook_name}' not found"}
         
-        # Build prompt from playbook
-        prompt = f"""Execute the following security playbook:
+        prompt = self._build_playbook_prompt(playbook_name, playbook, incident_data)
+        return self.analyze_incident(prompt, context=incident_data)
+    
+    async def run_playbook_async(self, playbook_name: str, incident_data: Dict) -> Dict[str, Any]:
+        """Asynchronous variant of run_playbook"""
+        playbook = self.get_playbook(playbook_name)
+        
+        if not playbook:
+            return {"error": f"Playbook '{playbook_name}' not found"}
+        
+        prompt = self._build_playbook_prompt(playbook_name, playbook, incident_data)
+        return await self.analyze_incident_async(prompt, context=incident_data)
+    
+    def _build_playbook_prompt(self, playbook_name: str, playbook: Dict, incident_data: Dict) -> str:
+        """Build the analysis prompt for a playbook run"""
+        return f"""Execute the following security playbook:
 
 Playbook: {playbook.get('name', playbook_name)}
 Description: {playbook.get('description', '')}
@@ -315,8 +700,6 @@ Follow these steps:
 {yaml.dump(playbook.get('steps', []), default_flow_style=False)}
 
 Provide a complete analysis following the standard SOC report format."""
-        
-        return self.analyze_incident(prompt, context=incident_data)
     
     def analyze_pcap(self, pcap_data: bytes, description: str = "") -> Dict[str, Any]:
         """Analyze PCAP data (simplified - would need full parser in production)"""
@@ -0,0 +1,80 @@
+"""
+Persistent on-disk cache for incident analysis results
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from soc_eater_v2.utils import json_utils
+
+
+class AnalysisCache:
+    """
+    SQLite-backed memo of analysis results keyed by a hash of prompt + context.
+
+    Safe to share between worker threads; entries older than ttl_seconds are
+    treated as misses and deleted when the cache is opened.
+    """
+
+    def __init__(self, path: str, ttl_seconds: int = 3600):
+        db_path = Path(path).expanduser()
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(db_path), check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS analyses ("
+            "hash TEXT PRIMARY KEY, result BLOB NOT NULL, ts INTEGER NOT NULL)"
+        )
+        self._conn.execute(
+            "DELETE FROM analyses WHERE ts < ?", (int(time.time()) - ttl_seconds,)
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(prompt: str, context: Optional[Dict] = None) -> str:
+        """Stable SHA-256 key for a prompt and its (order-independent) context"""
+        payload = prompt + json.dumps(context or {}, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the cached result for key, or None if missing or expired"""
+        try:
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT result, ts FROM analyses WHERE hash = ?", (key,)
+                ).fetchone()
+        except sqlite3.Error:
+            return None
+
+        if row is None:
+            return None
+
+        result, ts = row
+        if time.time() - ts > self.ttl_seconds:
+            return None
+        return json_utils.loads(result)
+
+    def put(self, key: str, result: Dict[str, Any]):
+        """Store a result, replacing any previous entry for key"""
+        blob = json_utils.dumps(result)
+        try:
+            with self._lock:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO analyses (hash, result, ts) VALUES (?, ?, ?)",
+                    (key, blob, int(time.time())),
+                )
+                self._conn.commit()
+        except sqlite3.Error as e:
+            print(f"Failed to cache analysis result: {e}")
+
+    def close(self):
+        """Close the underlying database connection"""
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,24 @@
+"""
+Image loading helpers for multimodal analysis
+"""
+
+from typing import IO, Union
+
+# Longest edge worth sending to Gemini; larger images are downscaled server-side anyway
+MAX_MODEL_IMAGE_SIZE = (1568, 1568)
+
+
+def load_image_for_model(source: Union[str, IO[bytes]], max_size=MAX_MODEL_IMAGE_SIZE):
+    """
+    Open an image and shrink it to at most max_size before it is sent to the model.
+    
+    For JPEGs, Image.draft lets the decoder work at a reduced DCT scale, so large
+    screenshots are never fully decoded to RGB in memory.
+    """
+    from PIL import Image
+    
+    img = Image.open(source)
+    img.draft("RGB", max_size)
+    img = img.convert("RGB")
+    img.thumbnail(max_size, Image.Resampling.LANCZOS)
+    return img
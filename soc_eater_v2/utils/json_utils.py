@@ -0,0 +1,54 @@
+"""
+JSON helpers that prefer a fast backend when one is installed
+
+Tries orjson, then ujson, then falls back to the stdlib json module.
+Every backend raises a ValueError subclass on malformed input, so callers
+can catch ValueError regardless of which one is active.
+
+The backends are not interchangeable for arbitrary input: orjson turns
+integers wider than 64 bits into floats (losing precision) and rejects
+NaN/Infinity, which the stdlib accepts. Use these helpers only for
+documents this package writes itself (e.g. the analysis cache); parse
+user-supplied JSON such as incident data with the stdlib json module.
+"""
+
+from typing import Any, Union
+
+try:
+    import orjson as _orjson
+except ImportError:
+    _orjson = None
+
+try:
+    import ujson as _ujson
+except ImportError:
+    _ujson = None
+
+import json as _json
+
+
+if _orjson is not None:
+    BACKEND = "orjson"
+elif _ujson is not None:
+    BACKEND = "ujson"
+else:
+    BACKEND = "json"
+
+
+def loads(data: Union[str, bytes]) -> Any:
+    """Parse a JSON document from str or bytes"""
+    if _orjson is not None:
+        return _orjson.loads(data)
+    if _ujson is not None:
+        return _ujson.loads(data)
+    return _json.loads(data)
+
+
+def dumps(obj: Any, sort_keys: bool = False) -> str:
+    """Serialize obj to a compact JSON string"""
+    if _orjson is not None:
+        option = _orjson.OPT_SORT_KEYS if sort_keys else 0
+        return _orjson.dumps(obj, option=option).decode("utf-8")
+    if _ujson is not None:
+        return _ujson.dumps(obj, sort_keys=sort_keys, ensure_ascii=False)
+    return _json.dumps(obj, sort_keys=sort_keys, ensure_ascii=False, separators=(",", ":"))
@@ -3,14 +3,49 @@ PCAP parser utility for extracting network traffic metadata
 """
 
 import io
+import mmap
+import os
+import re
 from collections import Counter
-from typing import Dict, List, Set
+from typing import Dict, List, Set, Union
 
 
-def summarize_pcap_bytes(pcap_bytes: bytes, max_packets: int = 4000) -> str:
+PcapBuffer = Union[bytes, bytearray, memoryview, mmap.mmap]
+
+# Cheap bytes-level test for an HTTP request line ("GET ", "PROPFIND ", ...);
+# responses and continuation segments fail it without invoking the dpkt parser
+_HTTP_REQUEST_LINE_RE = re.compile(rb"[A-Z][A-Z_-]{2,19} ")
+
+
+def summarize_pcap_file(path: str, max_packets: int = 4000) -> str:
+    """
+    Summarize a PCAP/PCAPNG file on disk without reading it into memory.
+    
+    The file is memory-mapped and handed to the parser directly, so large
+    captures are paged in on demand instead of being copied into a bytes object.
+    """
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return summarize_pcap_bytes(b"", max_packets=max_packets)
+        
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return summarize_pcap_bytes(mm, max_packets=max_packets)
+
+
+def _open_stream(pcap_bytes: PcapBuffer):
+    """Return a file-like reader over the capture, reusing mmaps without copying"""
+    if isinstance(pcap_bytes, mmap.mmap):
+        pcap_bytes.seek(0)
+        return pcap_bytes
+    return io.BytesIO(pcap_bytes)
+
+
+def summarize_pcap_bytes(pcap_bytes: PcapBuffer, max_packets: int = 4000) -> str:
     """
     Parse PCAP/PCAPNG bytes and return a text summary suitable for LLM analysis.
     
+    Accepts any bytes-like buffer, including a read-only mmap of the capture.
+    
     Extracts:
     - Source/dest IPs
     - Source/dest ports
@@ -41,10 +76,10 @@ def summarize_pcap_bytes(pcap_bytes: bytes, max_packets: int = 4000) -> str:
     try:
         # Try PCAP format
         try:
-            pcap = dpkt.pcap.Reader(io.BytesIO(pcap_bytes))
+            pcap = dpkt.pcap.Reader(_open_stream(pcap_bytes))
         except Exception:
             # Try PCAPNG format
-            pcap = dpkt.pcapng.Reader(io.BytesIO(pcap_bytes))
+            pcap = dpkt.pcapng.Reader(_open_stream(pcap_bytes))
         
         for ts, buf in pcap:
             if packet_count >= max_packets:
@@ -65,8 +100,9 @@ def summarize_pcap_bytes(pcap_bytes: bytes, max_packets: int = 4000) -> str:
                 
                 # Get IP addresses
                 try:
-                    src_ip = socket.inet_ntop(socket.AF_INET if isinstance(ip, dpkt.ip.IP) else socket.AF_INET6, ip.src)
-                    dst_ip = socket.inet_ntop(socket.AF_INET if isinstance(ip, dpkt.ip.IP) else socket.AF_INET6, ip.dst)
+                    family = socket.AF_INET if isinstance(ip, dpkt.ip.IP) else socket.AF_INET6
+                    src_ip = socket.inet_ntop(family, ip.src)
+                    dst_ip = socket.inet_ntop(family, ip.dst)
                 except Exception:
                     continue
                 
@@ -83,8 +119,8 @@ def summarize_pcap_bytes(pcap_bytes: bytes, max_packets: int = 4000) -> str:
                     protocols["TCP"] += 1
                     ports[tcp.dport] += 1
                     
-                    # Check for HTTP
-                    if tcp.dport == 80 or tcp.sport == 80:
+                    # Check for HTTP (only segments that start with a request line)
+                    if (tcp.dport == 80 or tcp.sport == 80) and _HTTP_REQUEST_LINE_RE.match(tcp.data):
                         try:
                             http = dpkt.http.Request(tcp.data)
                             http_requests.append({
@@ -101,7 +137,7 @@ def summarize_pcap_bytes(pcap_bytes: bytes, max_packets: int = 4000) -> str:
                     ports[udp.dport] += 1
                     
                     # Check for DNS
-                    if udp.dport == 53 or udp.sport == 53:
+                    if udp.data and (udp.dport == 53 or udp.sport == 53):
                         try:
                             dns = dpkt.dns.DNS(udp.data)
                             if dns.qd:
@@ -0,0 +1,43 @@
+"""
+Token-bucket throttle for outgoing model calls
+"""
+
+import threading
+import time
+
+
+class TokenBucket:
+    """
+    Allows up to `rate` acquisitions per `period` seconds, with bursts of up
+    to `rate`. acquire() blocks until a token is available.
+
+    Safe to share between worker threads.
+    """
+
+    def __init__(self, rate: int, period: float = 60.0):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+
+        self.capacity = rate
+        self.refill_per_second = rate / period
+        self._tokens = float(rate)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Take one token, sleeping until the bucket has refilled enough"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(
+                    self.capacity,
+                    self._tokens + (now - self._updated) * self.refill_per_second
+                )
+                self._updated = now
+
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.refill_per_second
+
+            time.sleep(wait)